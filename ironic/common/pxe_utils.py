@@ -56,6 +56,10 @@ RESCUE_KERNEL_RAMDISK_LABELS = ['rescue_kernel', 'rescue_ramdisk']
 KERNEL_RAMDISK_LABELS = {'deploy': DEPLOY_KERNEL_RAMDISK_LABELS,
                          'rescue': RESCUE_KERNEL_RAMDISK_LABELS}
 
+# Translation table turning a MAC address into the dash delimited, lower
+# case form used for PXE config file names in a single pass.
+_MAC_TO_DASHED_LOWER = str.maketrans('ABCDEF:', 'abcdef-')
+
 
 def get_root_dir():
     """Returns the directory where the config files and images will live."""
@@ -66,6 +70,23 @@ def get_ipxe_root_dir():
     return CONF.deploy.http_root
 
 
+def _get_root_dir(ipxe_enabled=False):
+    """Returns the root directory for either PXE or iPXE.
+
+    Callers iterating over ports should look this up once and pass it
+    along, rather than resolving the configuration option for each port.
+
+    :param ipxe_enabled: Default false boolean to indicate if ipxe
+                         is in use by the caller.
+    :returns: The HTTP root if iPXE is enabled, otherwise the TFTP root,
+              without a trailing slash.
+    """
+    root_dir = get_ipxe_root_dir() if ipxe_enabled else get_root_dir()
+    # NOTE: Paths are built by appending '/<name>' to the root directory,
+    # so drop any trailing slash the operator may have configured.
+    return root_dir.rstrip('/') or '/'
+
+
 def _ensure_config_dirs_exist(task, ipxe_enabled=False):
     """Ensure that the node's and PXE configuration directories exist.
 
@@ -73,10 +94,7 @@ def _ensure_config_dirs_exist(task, ipxe_enabled=False):
     :param ipxe_enabled: Default false boolean to indicate if ipxe
                          is in use by the caller.
     """
-    if ipxe_enabled:
-        root_dir = get_ipxe_root_dir()
-    else:
-        root_dir = get_root_dir()
+    root_dir = _get_root_dir(ipxe_enabled)
     node_dir = os.path.join(root_dir, task.node.uuid)
     pxe_dir = os.path.join(root_dir, PXE_CFG_DIR_NAME)
     # NOTE: We should only change the permissions if the folder
@@ -84,10 +102,15 @@ def _ensure_config_dirs_exist(task, ipxe_enabled=False):
     # already created it and placed specific ACLs upon the folder
     # which may not recurse downward.
     for directory in (node_dir, pxe_dir):
-        if not os.path.isdir(directory):
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            continue
+        except FileNotFoundError:
+            # The root directory itself is missing, create the whole tree.
             fileutils.ensure_tree(directory)
-            if CONF.pxe.dir_permission:
-                os.chmod(directory, CONF.pxe.dir_permission)
+        if CONF.pxe.dir_permission:
+            os.chmod(directory, CONF.pxe.dir_permission)
 
 
 def _link_mac_pxe_configs(task, ipxe_enabled=False):
@@ -97,23 +120,25 @@ def _link_mac_pxe_configs(task, ipxe_enabled=False):
     :param ipxe_enabled: Default false boolean to indicate if ipxe
                          is in use by the caller.
     """
-
-    def create_link(mac_path):
-        ironic_utils.unlink_without_raise(mac_path)
-        relative_source_path = os.path.relpath(
-            pxe_config_file_path, os.path.dirname(mac_path))
-        utils.create_link_without_raise(relative_source_path, mac_path)
-
-    pxe_config_file_path = get_pxe_config_file_path(
-        task.node.uuid, ipxe_enabled=ipxe_enabled)
+    root_dir = _get_root_dir(ipxe_enabled)
+    # NOTE: The node's PXE config file is always <root_dir>/<uuid>/config,
+    # see get_pxe_config_file_path(). MAC based links only ever live in
+    # <root_dir>/pxelinux.cfg or <root_dir> itself, so the relative paths
+    # to the config file are known up front.
+    relpath_from_root_dir = f'{task.node.uuid}/config'
+    relpath_from_cfg_dir = f'../{relpath_from_root_dir}'
     for port in task.ports:
         client_id = port.extra.get('client-id')
         # Syslinux, ipxe, depending on settings.
-        create_link(_get_pxe_mac_path(port.address, client_id=client_id,
-                                      ipxe_enabled=ipxe_enabled))
+        utils.replace_link_without_raise(
+            relpath_from_cfg_dir,
+            _get_pxe_mac_path(port.address, client_id=client_id,
+                              ipxe_enabled=ipxe_enabled, root_dir=root_dir))
         # Grub2 MAC address only
-        create_link(_get_pxe_grub_mac_path(port.address,
-                                           ipxe_enabled=ipxe_enabled))
+        utils.replace_link_without_raise(
+            relpath_from_root_dir,
+            _get_pxe_grub_mac_path(port.address, ipxe_enabled=ipxe_enabled,
+                                   root_dir=root_dir))
 
 
 def _link_ip_address_pxe_configs(task, ipxe_enabled=False):
@@ -126,6 +151,11 @@ def _link_ip_address_pxe_configs(task, ipxe_enabled=False):
     :raises: InvalidIPv4Address
 
     """
+    # NOTE: Without DHCP address management there are no IP addresses
+    # to link, skip asking the provider for them.
+    if CONF.dhcp.dhcp_provider == 'none':
+        return
+
     pxe_config_file_path = get_pxe_config_file_path(
         task.node.uuid,
         ipxe_enabled=ipxe_enabled)
@@ -145,22 +175,23 @@ def _link_ip_address_pxe_configs(task, ipxe_enabled=False):
                 {'node': task.node.uuid})
         # Just in case, reset to empty list if we got nothing.
         ip_addrs = []
+    # NOTE: All IP address based configs live directly in the TFTP root.
+    relative_source_path = os.path.relpath(pxe_config_file_path,
+                                           CONF.pxe.tftp_root)
     for port_ip_address in ip_addrs:
         ip_address_path = _get_pxe_ip_address_path(port_ip_address)
-        ironic_utils.unlink_without_raise(ip_address_path)
-        relative_source_path = os.path.relpath(
-            pxe_config_file_path, os.path.dirname(ip_address_path))
-        utils.create_link_without_raise(relative_source_path,
-                                        ip_address_path)
+        utils.replace_link_without_raise(relative_source_path,
+                                         ip_address_path)
 
 
-def _get_pxe_grub_mac_path(mac, ipxe_enabled=False):
-    root_dir = get_ipxe_root_dir() if ipxe_enabled else get_root_dir()
-    return os.path.join(root_dir, mac + '.conf')
+def _get_pxe_grub_mac_path(mac, ipxe_enabled=False, root_dir=None):
+    if root_dir is None:
+        root_dir = _get_root_dir(ipxe_enabled)
+    return f'{root_dir}/{mac}.conf'
 
 
 def _get_pxe_mac_path(mac, delimiter='-', client_id=None,
-                      ipxe_enabled=False):
+                      ipxe_enabled=False, root_dir=None):
     """Convert a MAC address into a PXE config file name.
 
     :param mac: A MAC address string in the format xx:xx:xx:xx:xx:xx.
@@ -169,19 +200,23 @@ def _get_pxe_mac_path(mac, delimiter='-', client_id=None,
                       Defaults is None (Ethernet)
     :param ipxe_enabled: A default False boolean value to tell the method
                          if the caller is using iPXE.
+    :param root_dir: The root directory to use, if already known by the
+                     caller. Defaults to the one matching ipxe_enabled.
     :returns: the path to the config file.
 
     """
-    mac_file_name = mac.replace(':', delimiter).lower()
+    if root_dir is None:
+        root_dir = _get_root_dir(ipxe_enabled)
+    if delimiter == '-':
+        mac_file_name = mac.translate(_MAC_TO_DASHED_LOWER)
+    else:
+        mac_file_name = mac.replace(':', delimiter).lower()
     if not ipxe_enabled:
         hw_type = '01-'
         if client_id:
             hw_type = '20-'
         mac_file_name = hw_type + mac_file_name
-        return os.path.join(get_root_dir(), PXE_CFG_DIR_NAME,
-                            mac_file_name)
-    return os.path.join(get_ipxe_root_dir(), PXE_CFG_DIR_NAME,
-                        mac_file_name)
+    return f'{root_dir}/{PXE_CFG_DIR_NAME}/{mac_file_name}'
 
 
 def _get_pxe_ip_address_path(ip_address):
@@ -192,9 +227,7 @@ def _get_pxe_ip_address_path(ip_address):
 
     """
     # grub2 bootloader needs ip based config file name.
-    return os.path.join(
-        CONF.pxe.tftp_root, ip_address + ".conf"
-    )
+    return f'{_get_root_dir()}/{ip_address}.conf'
 
 
 def get_kernel_ramdisk_info(node_uuid, driver_info, mode='deploy',
@@ -215,16 +248,13 @@ def get_kernel_ramdisk_info(node_uuid, driver_info, mode='deploy',
 
     Note: driver_info should be validated outside of this method.
     """
-    if ipxe_enabled:
-        root_dir = get_ipxe_root_dir()
-    else:
-        root_dir = get_root_dir()
+    root_dir = _get_root_dir(ipxe_enabled)
     image_info = {}
     labels = KERNEL_RAMDISK_LABELS[mode]
     for label in labels:
         image_info[label] = (
             str(driver_info[label]),
-            os.path.join(root_dir, node_uuid, label)
+            f'{root_dir}/{node_uuid}/{label}'
         )
     return image_info
 
@@ -238,10 +268,7 @@ def get_pxe_config_file_path(node_uuid, ipxe_enabled=False):
     :returns: The path to the node's PXE configuration file.
 
     """
-    if ipxe_enabled:
-        return os.path.join(get_ipxe_root_dir(), node_uuid, 'config')
-    else:
-        return os.path.join(get_root_dir(), node_uuid, 'config')
+    return f'{_get_root_dir(ipxe_enabled)}/{node_uuid}/config'
 
 
 def create_pxe_config(task, pxe_options, template=None, ipxe_enabled=False):
@@ -275,9 +302,10 @@ def create_pxe_config(task, pxe_options, template=None, ipxe_enabled=False):
     pxe_config_file_path = get_pxe_config_file_path(
         task.node.uuid,
         ipxe_enabled=ipxe_enabled)
-    is_uefi_boot_mode = (boot_mode_utils.get_boot_mode(task.node)
-                         == 'uefi')
-    uefi_with_grub = is_uefi_boot_mode and not ipxe_enabled
+    # NOTE: The boot mode only matters for grub, so do not bother looking
+    # it up when iPXE is in use.
+    uefi_with_grub = (not ipxe_enabled
+                      and boot_mode_utils.get_boot_mode(task.node) == 'uefi')
 
     # grub bootloader panics with '{}' around any of its tags in its
     # config file. To overcome that 'ROOT' and 'DISK_IDENTIFIER' are enclosed
@@ -302,18 +330,16 @@ def create_pxe_config(task, pxe_options, template=None, ipxe_enabled=False):
     # Always write the mac addresses
     _link_mac_pxe_configs(task, ipxe_enabled=ipxe_enabled)
     if uefi_with_grub:
+        # NOTE(TheJulia): IP address links are skipped when the
+        # dhcp_provider interface is set to none, in which case only
+        # the MAC address links are written for the grub use.
         try:
             _link_ip_address_pxe_configs(task, ipxe_enabled)
-        # NOTE(TheJulia): The IP address support will fail if the
-        # dhcp_provider interface is set to none. This will result
-        # in the MAC addresses and DHCP files being written, and
-        # we can remove IP address creation for the grub use.
         except exception.FailedToGetIPAddressOnPort as e:
-            if CONF.dhcp.dhcp_provider != 'none':
-                with excutils.save_and_reraise_exception():
-                    LOG.error('Unable to create boot config, IP address '
-                              'was unable to be retrieved. %(error)s',
-                              {'error': e})
+            with excutils.save_and_reraise_exception():
+                LOG.error('Unable to create boot config, IP address '
+                          'was unable to be retrieved. %(error)s',
+                          {'error': e})
 
 
 def create_ipxe_boot_script():
@@ -327,7 +353,13 @@ def create_ipxe_boot_script():
     # NOTE(pas-ha) to prevent unneeded writes,
     # only write to file if its content is different from required,
     # which should be rather rare
-    if (not os.path.isfile(bootfile_path)
+    # NOTE: compare the file size first, so that a changed script is
+    # usually detected with a single stat() instead of reading the file.
+    try:
+        bootfile_size = os.stat(bootfile_path).st_size
+    except OSError:
+        bootfile_size = None
+    if (bootfile_size != len(boot_script.encode('utf-8'))
             or not utils.file_has_content(bootfile_path, boot_script)):
         utils.write_to_file(bootfile_path, boot_script)
 
@@ -340,9 +372,10 @@ def clean_up_pxe_config(task, ipxe_enabled=False):
     """
     LOG.debug("Cleaning up PXE config for node %s", task.node.uuid)
 
-    is_uefi_boot_mode = (boot_mode_utils.get_boot_mode(task.node) == 'uefi')
-
-    if is_uefi_boot_mode and not ipxe_enabled:
+    root_dir = _get_root_dir(ipxe_enabled)
+    if (not ipxe_enabled
+            and CONF.dhcp.dhcp_provider != 'none'
+            and boot_mode_utils.get_boot_mode(task.node) == 'uefi'):
         api = dhcp_factory.DHCPFactory().provider
         ip_addresses = api.get_ip_addresses(task)
         if not ip_addresses:
@@ -364,16 +397,12 @@ def clean_up_pxe_config(task, ipxe_enabled=False):
         # syslinux, ipxe, etc.
         ironic_utils.unlink_without_raise(
             _get_pxe_mac_path(port.address, client_id=client_id,
-                              ipxe_enabled=ipxe_enabled))
+                              ipxe_enabled=ipxe_enabled, root_dir=root_dir))
         # Grub2 MAC address based confiuration
         ironic_utils.unlink_without_raise(
-            _get_pxe_grub_mac_path(port.address, ipxe_enabled=ipxe_enabled))
-    if ipxe_enabled:
-        utils.rmtree_without_raise(os.path.join(get_ipxe_root_dir(),
-                                                task.node.uuid))
-    else:
-        utils.rmtree_without_raise(os.path.join(get_root_dir(),
-                                                task.node.uuid))
+            _get_pxe_grub_mac_path(port.address, ipxe_enabled=ipxe_enabled,
+                                   root_dir=root_dir))
+    utils.rmtree_without_raise(os.path.join(root_dir, task.node.uuid))
 
 
 def _dhcp_option_file_or_url(task, urlboot=False, ip_version=None):
@@ -435,6 +464,7 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
         use_ip_version = int(CONF.pxe.ip_version)
     dhcp_opts = []
     dhcp_provider_name = CONF.dhcp.dhcp_provider
+    tftp_server = CONF.pxe.tftp_server
     if use_ip_version == 4:
         boot_file_param = DHCP_BOOTFILE_NAME
     else:
@@ -460,7 +490,7 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
         # addresses, since the format is http://[ff80::1]:80/boot.ipxe.
         # As opposed to requiring configuration, we can eventually make this
         # dynamic, and would need to do similar then.
-        ipxe_script_url = '/'.join([CONF.deploy.http_url, script_name])
+        ipxe_script_url = f'{CONF.deploy.http_url}/{script_name}'
         # if the request comes from dumb firmware send them the iPXE
         # boot image.
         if dhcp_provider_name == 'neutron':
@@ -472,19 +502,23 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
             if use_ip_version != 6:
                 dhcp_opts.append(
                     {'opt_name': "tag:!ipxe,%s" % boot_file_param,
-                     'opt_value': boot_file}
+                     'opt_value': boot_file,
+                     'ip_version': use_ip_version}
                 )
                 dhcp_opts.append(
                     {'opt_name': "tag:ipxe,%s" % boot_file_param,
-                     'opt_value': ipxe_script_url}
+                     'opt_value': ipxe_script_url,
+                     'ip_version': use_ip_version}
                 )
             else:
                 dhcp_opts.append(
                     {'opt_name': "tag:!ipxe6,%s" % boot_file_param,
-                     'opt_value': boot_file})
+                     'opt_value': boot_file,
+                     'ip_version': use_ip_version})
                 dhcp_opts.append(
                     {'opt_name': "tag:ipxe6,%s" % boot_file_param,
-                     'opt_value': ipxe_script_url})
+                     'opt_value': ipxe_script_url,
+                     'ip_version': use_ip_version})
         else:
             # !175 == non-iPXE.
             # http://ipxe.org/howto/dhcpd#ipxe-specific_options
@@ -498,12 +532,15 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
             # a down stream driver.
             dhcp_opts.append({'opt_name': "!%s,%s" % (DHCP_IPXE_ENCAP_OPTS,
                               boot_file_param),
-                              'opt_value': boot_file})
+                              'opt_value': boot_file,
+                              'ip_version': use_ip_version})
             dhcp_opts.append({'opt_name': boot_file_param,
-                              'opt_value': ipxe_script_url})
+                              'opt_value': ipxe_script_url,
+                              'ip_version': use_ip_version})
     else:
         dhcp_opts.append({'opt_name': boot_file_param,
-                          'opt_value': boot_file})
+                          'opt_value': boot_file,
+                          'ip_version': use_ip_version})
         # 210 == tftp server path-prefix or tftp root, will be used to find
         # pxelinux.cfg directory. The pxelinux.0 loader infers this information
         # from it's own path, but Petitboot needs it to be specified by this
@@ -511,13 +548,16 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
         if not url_boot:
             dhcp_opts.append(
                 {'opt_name': DHCP_TFTP_PATH_PREFIX,
-                 'opt_value': get_tftp_path_prefix()})
+                 'opt_value': get_tftp_path_prefix(),
+                 'ip_version': use_ip_version})
 
     if not url_boot:
         dhcp_opts.append({'opt_name': DHCP_TFTP_SERVER_NAME,
-                          'opt_value': CONF.pxe.tftp_server})
+                          'opt_value': tftp_server,
+                          'ip_version': use_ip_version})
         dhcp_opts.append({'opt_name': DHCP_TFTP_SERVER_ADDRESS,
-                          'opt_value': CONF.pxe.tftp_server})
+                          'opt_value': tftp_server,
+                          'ip_version': use_ip_version})
     # NOTE(vsaienko) set this option specially for dnsmasq case as it always
     # sets `siaddr` field which is treated by pxe clients as TFTP server
     # see page 9 https://tools.ietf.org/html/rfc2131.
@@ -533,12 +573,33 @@ def dhcp_options_for_instance(task, ipxe_enabled=False, url_boot=False,
     # https://bugs.launchpad.net/neutron/+bug/1723354
     if not url_boot:
         dhcp_opts.append({'opt_name': 'server-ip-address',
-                          'opt_value': CONF.pxe.tftp_server})
+                          'opt_value': tftp_server,
+                          'ip_version': use_ip_version})
+
+    return dhcp_opts
+
 
-    # Append the IP version for all the configuration options
-    for opt in dhcp_opts:
-        opt.update({'ip_version': use_ip_version})
+def dhcp_options_for_instance_all_versions(task, ipxe_enabled=False,
+                                           url_boot=False):
+    """Retrieves the DHCP PXE boot options for both IPv4 and IPv6.
 
+    Convenience wrapper calling dhcp_options_for_instance() once per IP
+    version. Options are generated for both IP versions, they can be
+    filtered down later based upon the port options.
+
+    :param task: A TaskManager instance.
+    :param ipxe_enabled: Default false boolean that signals if iPXE
+                         formatting should be returned by the method
+                         for DHCP server configuration.
+    :param url_boot: Default false boolean to inform the method if
+                     a URL should be returned to boot the node. Has no
+                     effect on the IPv6 options.
+    :returns: A list of the combined IPv4 and IPv6 DHCP options.
+    """
+    dhcp_opts = dhcp_options_for_instance(task, ipxe_enabled=ipxe_enabled,
+                                          url_boot=url_boot, ip_version=4)
+    dhcp_opts += dhcp_options_for_instance(task, ipxe_enabled=ipxe_enabled,
+                                           url_boot=url_boot, ip_version=6)
     return dhcp_opts
 
 
@@ -547,7 +608,10 @@ def get_tftp_path_prefix():
 
     :return: CONF.pxe.tftp_root ensured to have a trailing slash
     """
-    return os.path.join(CONF.pxe.tftp_root, '')
+    tftp_root = CONF.pxe.tftp_root
+    if tftp_root.endswith('/'):
+        return tftp_root
+    return tftp_root + '/'
 
 
 def get_path_relative_to_tftp_root(file_path):
@@ -588,12 +652,18 @@ def parse_driver_info(node, mode='deploy'):
 
     params_to_check = KERNEL_RAMDISK_LABELS[mode]
 
-    d_info = {k: info.get(k) for k in params_to_check}
-    if not any(d_info.values()):
+    d_info = {}
+    has_any = False
+    for k in params_to_check:
+        d_info[k] = value = info.get(k)
+        if value:
+            has_any = True
+    if not has_any:
         # NOTE(dtantsur): avoid situation when e.g. deploy_kernel comes from
         # driver_info but deploy_ramdisk comes from configuration, since it's
         # a sign of a potential operator's mistake.
-        d_info = {k: getattr(CONF.conductor, k) for k in params_to_check}
+        conductor_conf = CONF.conductor
+        d_info = {k: getattr(conductor_conf, k) for k in params_to_check}
     error_msg = _("Cannot validate PXE bootloader. Some parameters were"
                   " missing in node's driver_info and configuration")
     deploy_utils.check_for_missing_params(d_info, error_msg)
@@ -623,15 +693,12 @@ def get_instance_image_info(task, ipxe_enabled=False):
     if (node.driver_internal_info.get('is_whole_disk_image')
             or deploy_utils.get_boot_option(node) == 'local'):
         return image_info
-    if ipxe_enabled:
-        root_dir = get_ipxe_root_dir()
-    else:
-        root_dir = get_root_dir()
+    root_dir = _get_root_dir(ipxe_enabled)
     i_info = node.instance_info
     if i_info.get('boot_iso'):
         image_info['boot_iso'] = (
             i_info['boot_iso'],
-            os.path.join(root_dir, node.uuid, 'boot_iso'))
+            f'{root_dir}/{node.uuid}/boot_iso')
 
         return image_info
 
@@ -647,7 +714,7 @@ def get_instance_image_info(task, ipxe_enabled=False):
     for label in labels:
         image_info[label] = (
             i_info[label],
-            os.path.join(root_dir, node.uuid, label)
+            f'{root_dir}/{node.uuid}/{label}'
         )
 
     return image_info
@@ -683,22 +750,25 @@ def build_deploy_pxe_options(task, pxe_info, mode='deploy',
     node = task.node
     kernel_label = '%s_kernel' % mode
     ramdisk_label = '%s_ramdisk' % mode
-    for label, option in ((kernel_label, 'deployment_aki_path'),
-                          (ramdisk_label, 'deployment_ari_path')):
-        if ipxe_enabled:
+    labels = ((kernel_label, 'deployment_aki_path'),
+              (ramdisk_label, 'deployment_ari_path'))
+    if ipxe_enabled:
+        # NOTE: Both the kernel and the ramdisk share the same URL prefix,
+        # so only compute it once.
+        use_swift = CONF.pxe.ipxe_use_swift
+        url_prefix = f'{CONF.deploy.http_url}/{node.uuid}'
+        for label, option in labels:
             image_href = pxe_info[label][0]
-            if (CONF.pxe.ipxe_use_swift
-                    and service_utils.is_glance_image(image_href)):
+            if use_swift and service_utils.is_glance_image(image_href):
                 pxe_opts[option] = images.get_temp_url_for_glance_image(
                     task.context, image_href)
             else:
-                pxe_opts[option] = '/'.join([CONF.deploy.http_url, node.uuid,
-                                            label])
-        else:
+                pxe_opts[option] = f'{url_prefix}/{label}'
+        pxe_opts['initrd_filename'] = ramdisk_label
+    else:
+        for label, option in labels:
             pxe_opts[option] = get_path_relative_to_tftp_root(
                 pxe_info[label][1])
-    if ipxe_enabled:
-        pxe_opts['initrd_filename'] = ramdisk_label
     return pxe_opts
 
 
@@ -714,8 +784,8 @@ def build_instance_pxe_options(task, pxe_info, ipxe_enabled=False):
                 # ramdisk of user image when boot_option is not local,
                 # as this breaks instance reboot later when temp urls
                 # have timed out.
-                pxe_opts[option] = '/'.join(
-                    [CONF.deploy.http_url, node.uuid, label])
+                pxe_opts[option] = (
+                    f'{CONF.deploy.http_url}/{node.uuid}/{label}')
             else:
                 # It is possible that we don't have kernel/ramdisk or even
                 # image_source to determine if it's a whole disk image or not.
@@ -736,8 +806,8 @@ def build_instance_pxe_options(task, pxe_info, ipxe_enabled=False):
         # TODO(TheJulia): Boot iso should change at a later point
         # if we serve more than just as a pass-through.
         if i_info.get('boot_iso'):
-            pxe_opts['boot_iso_url'] = '/'.join(
-                [CONF.deploy.http_url, node.uuid, 'boot_iso'])
+            pxe_opts['boot_iso_url'] = (
+                f'{CONF.deploy.http_url}/{node.uuid}/boot_iso')
     except KeyError:
         pass
 
@@ -747,16 +817,18 @@ def build_instance_pxe_options(task, pxe_info, ipxe_enabled=False):
 def build_extra_pxe_options(ramdisk_params=None):
     # Enable debug in IPA according to CONF.debug if it was not
     # specified yet
-    pxe_append_params = CONF.pxe.pxe_append_params
-    if CONF.debug and 'ipa-debug' not in pxe_append_params:
-        pxe_append_params += ' ipa-debug=1'
+    pxe_conf = CONF.pxe
+    append_params = pxe_conf.pxe_append_params
+    pxe_append_params = [append_params]
+    if CONF.debug and 'ipa-debug' not in append_params:
+        pxe_append_params.append('ipa-debug=1')
     if ramdisk_params:
-        pxe_append_params += ' ' + ' '.join('%s=%s' % tpl
-                                            for tpl in ramdisk_params.items())
+        pxe_append_params.extend([f'{key}={value}'
+                                  for key, value in ramdisk_params.items()])
 
-    return {'pxe_append_params': pxe_append_params,
-            'tftp_server': CONF.pxe.tftp_server,
-            'ipxe_timeout': CONF.pxe.ipxe_timeout * 1000}
+    return {'pxe_append_params': ' '.join(pxe_append_params),
+            'tftp_server': pxe_conf.tftp_server,
+            'ipxe_timeout': pxe_conf.ipxe_timeout * 1000}
 
 
 def build_pxe_config_options(task, pxe_info, service=False,
@@ -846,34 +918,42 @@ def build_service_pxe_config(task, instance_image_info,
         ipxe_enabled=ipxe_enabled)
 
 
+def _return_item_or_first_if_list(item):
+    if isinstance(item, list):
+        return item[0]
+    return item
+
+
+def _get_volume_property(properties, key):
+    """Get a volume target property, falling back to its plural form."""
+    prop = _return_item_or_first_if_list(properties.get(key, ''))
+    if prop != '':
+        return prop
+    return _return_item_or_first_if_list(properties.get(key + 's', ''))
+
+
+def _generate_iscsi_url(properties):
+    """Returns iscsi url."""
+    portal = _get_volume_property(properties, 'target_portal')
+    iqn = _get_volume_property(properties, 'target_iqn')
+    lun = _get_volume_property(properties, 'target_lun')
+
+    # NOTE: Split the port off at the last colon, so that a bracketed
+    # IPv6 literal such as [fe80::1]:3260 keeps its address intact.
+    host, sep, port = portal.rpartition(':')
+    if not sep:
+        host, port = portal, ''
+    elif ':' in host and not (host.startswith('[') and host.endswith(']')):
+        # An IPv6 address without a port or without brackets cannot be
+        # told apart from host:port.
+        raise ValueError(
+            _("Invalid iSCSI target portal %s, IPv6 addresses must be "
+              "enclosed in brackets and followed by a port.") % portal)
+    return f'iscsi:{host}::{port}:{lun}:{iqn}'
+
+
 def get_volume_pxe_options(task):
     """Identify volume information for iPXE template generation."""
-    def __return_item_or_first_if_list(item):
-        if isinstance(item, list):
-            return item[0]
-        else:
-            return item
-
-    def __get_property(properties, key):
-        prop = __return_item_or_first_if_list(properties.get(key, ''))
-        if prop != '':
-            return prop
-        return __return_item_or_first_if_list(properties.get(key + 's', ''))
-
-    def __generate_iscsi_url(properties):
-        """Returns iscsi url."""
-        portal = __get_property(properties, 'target_portal')
-        iqn = __get_property(properties, 'target_iqn')
-        lun = __get_property(properties, 'target_lun')
-
-        if ':' in portal:
-            host, port = portal.split(':')
-        else:
-            host = portal
-            port = ''
-        return ("iscsi:%(host)s::%(port)s:%(lun)s:%(iqn)s" %
-                {'host': host, 'port': port, 'lun': lun, 'iqn': iqn})
-
     pxe_options = {}
     node = task.node
     boot_volume = node.driver_internal_info.get('boot_from_volume')
@@ -881,31 +961,27 @@ def get_volume_pxe_options(task):
                                               boot_volume)
 
     properties = volume.properties
-    if 'iscsi' in volume['volume_type']:
+    if 'iscsi' in volume.volume_type:
         if 'auth_username' in properties:
             pxe_options['username'] = properties['auth_username']
         if 'auth_password' in properties:
             pxe_options['password'] = properties['auth_password']
-        iscsi_initiator_iqn = None
-        for vc in task.volume_connectors:
-            if vc.type == 'iqn':
-                iscsi_initiator_iqn = vc.connector_id
+        iscsi_initiator_iqn = next((vc.connector_id
+                                    for vc in task.volume_connectors
+                                    if vc.type == 'iqn'), None)
 
         pxe_options.update(
-            {'iscsi_boot_url': __generate_iscsi_url(volume.properties),
+            {'iscsi_boot_url': _generate_iscsi_url(properties),
              'iscsi_initiator_iqn': iscsi_initiator_iqn})
         # NOTE(TheJulia): This may be the route to multi-path, define
         # volumes via sanhook in the ipxe template and let the OS sort it out.
-        extra_targets = []
-
-        for target in task.volume_targets:
-            if target.boot_index != 0 and 'iscsi' in target.volume_type:
-                iscsi_url = __generate_iscsi_url(target.properties)
-                username = target.properties['auth_username']
-                password = target.properties['auth_password']
-                extra_targets.append({'url': iscsi_url,
-                                      'username': username,
-                                      'password': password})
+        extra_targets = [
+            {'url': _generate_iscsi_url(target.properties),
+             'username': target.properties['auth_username'],
+             'password': target.properties['auth_password']}
+            for target in task.volume_targets
+            if target.boot_index != 0 and 'iscsi' in target.volume_type
+        ]
         pxe_options.update({'iscsi_volumes': extra_targets,
                             'boot_from_volume': True})
     # TODO(TheJulia): FibreChannel boot, i.e. wwpn in volume_type
@@ -915,25 +991,29 @@ def get_volume_pxe_options(task):
 
 def validate_boot_parameters_for_trusted_boot(node):
     """Check if boot parameters are valid for trusted boot."""
-    boot_mode = boot_mode_utils.get_boot_mode(node)
-    boot_option = deploy_utils.get_boot_option(node)
     is_whole_disk_image = node.driver_internal_info.get('is_whole_disk_image')
     # 'is_whole_disk_image' is not supported by trusted boot, because there is
     # no Kernel/Ramdisk to measure at all.
-    if (boot_mode != 'bios'
-        or is_whole_disk_image
-        or boot_option != 'netboot'):
-        msg = (_("Trusted boot is only supported in BIOS boot mode with "
-                 "netboot and without whole_disk_image, but Node "
-                 "%(node_uuid)s was configured with boot_mode: %(boot_mode)s, "
-                 "boot_option: %(boot_option)s, is_whole_disk_image: "
-                 "%(is_whole_disk_image)s: at least one of them is wrong, and "
-                 "this can be caused by enable secure boot.") %
-               {'node_uuid': node.uuid, 'boot_mode': boot_mode,
-                'boot_option': boot_option,
-                'is_whole_disk_image': is_whole_disk_image})
-        LOG.error(msg)
-        raise exception.InvalidParameterValue(msg)
+    # NOTE: Check the cheapest condition first, the boot mode and boot
+    # option are only looked up when the previous checks passed.
+    if (not is_whole_disk_image
+            and boot_mode_utils.get_boot_mode(node) == 'bios'
+            and deploy_utils.get_boot_option(node) == 'netboot'):
+        return
+
+    boot_mode = boot_mode_utils.get_boot_mode(node)
+    boot_option = deploy_utils.get_boot_option(node)
+    msg = (_("Trusted boot is only supported in BIOS boot mode with "
+             "netboot and without whole_disk_image, but Node "
+             "%(node_uuid)s was configured with boot_mode: %(boot_mode)s, "
+             "boot_option: %(boot_option)s, is_whole_disk_image: "
+             "%(is_whole_disk_image)s: at least one of them is wrong, and "
+             "this can be caused by enable secure boot.") %
+           {'node_uuid': node.uuid, 'boot_mode': boot_mode,
+            'boot_option': boot_option,
+            'is_whole_disk_image': is_whole_disk_image})
+    LOG.error(msg)
+    raise exception.InvalidParameterValue(msg)
 
 
 def prepare_instance_pxe_config(task, image_info,
@@ -952,16 +1032,7 @@ def prepare_instance_pxe_config(task, image_info,
     :returns: None
     """
     node = task.node
-    # Generate options for both IPv4 and IPv6, and they can be
-    # filtered down later based upon the port options.
-    # TODO(TheJulia): This should be re-tooled during the Victoria
-    # development cycle so that we call a single method and return
-    # combined options. The method we currently call is relied upon
-    # by two eternal projects, to changing the behavior is not ideal.
-    dhcp_opts = dhcp_options_for_instance(task, ipxe_enabled,
-                                          ip_version=4)
-    dhcp_opts += dhcp_options_for_instance(task, ipxe_enabled,
-                                           ip_version=6)
+    dhcp_opts = dhcp_options_for_instance_all_versions(task, ipxe_enabled)
     provider = dhcp_factory.DHCPFactory()
     provider.update_dhcp(task, dhcp_opts)
     pxe_config_path = get_pxe_config_file_path(
@@ -1002,14 +1073,12 @@ def cache_ramdisk_kernel(task, pxe_info, ipxe_enabled=False):
     """Fetch the necessary kernels and ramdisks for the instance."""
     ctx = task.context
     node = task.node
-    if ipxe_enabled:
-        path = os.path.join(get_ipxe_root_dir(), node.uuid)
-    else:
-        path = os.path.join(get_root_dir(), node.uuid)
+    path = os.path.join(_get_root_dir(ipxe_enabled), node.uuid)
     fileutils.ensure_tree(path)
     LOG.debug("Fetching necessary kernel and ramdisk for node %s",
               node.uuid)
-    deploy_utils.fetch_images(ctx, TFTPImageCache(), list(pxe_info.values()),
+    deploy_utils.fetch_images(ctx, TFTPImageCache(),
+                              tuple(pxe_info.values()),
                               CONF.force_raw_images)
 
 
@@ -1024,8 +1093,7 @@ def clean_up_pxe_env(task, images_info, ipxe_enabled=False):
         to be cleaned up (kernel, ramdisk, etc) and values are a tuple of
         identifier and absolute path.
     """
-    for label in images_info:
-        path = images_info[label][1]
+    for _image_id, path in images_info.values():
         ironic_utils.unlink_without_raise(path)
 
     clean_up_pxe_config(task, ipxe_enabled=ipxe_enabled)
@@ -21,6 +21,7 @@
 import contextlib
 import datetime
 import errno
+import functools
 import hashlib
 import ipaddress
 import os
@@ -28,6 +29,7 @@ import re
 import shutil
 import tempfile
 
+from ironic_lib import utils as ironic_utils
 import jinja2
 from oslo_concurrency import processutils
 from oslo_log import log as logging
@@ -294,6 +296,34 @@ def create_link_without_raise(source, link):
                         {'source': source, 'link': link, 'e': e})
 
 
+def replace_link_without_raise(source, link):
+    """Atomically create or replace a symbolic link.
+
+    The link is first created under a temporary name and then renamed over
+    ``link``, so an existing file is replaced without a window during
+    which ``link`` does not exist.
+
+    :param source: the path the link should point to.
+    :param link: the path of the link to create or replace.
+    """
+    tmp_link = link + '.tmp'
+    try:
+        try:
+            os.symlink(source, tmp_link)
+        except FileExistsError:
+            # Left over from an interrupted attempt, start over.
+            os.unlink(tmp_link)
+            os.symlink(source, tmp_link)
+        os.replace(tmp_link, link)
+    except OSError as e:
+        # Do not leave the temporary link behind, nothing else would
+        # ever clean it up.
+        ironic_utils.unlink_without_raise(tmp_link)
+        LOG.warning("Failed to create symlink from "
+                    "%(source)s to %(link)s, error: %(e)s",
+                    {'source': source, 'link': link, 'e': e})
+
+
 def safe_rstrip(value, chars=None):
     """Removes trailing characters from a string if that does not make it empty
 
@@ -468,6 +498,27 @@ def validate_network_port(port, port_name="Port"):
         {'port_name': port_name, 'port': port})
 
 
+def _get_jinja_environment(loader):
+    # NOTE(pas-ha) bandit does not seem to cope with such syntaxis
+    # and still complains with B701 for that line
+    # NOTE(pas-ha) not using default_for_string=False as we set the name
+    # of the template above for strings too.
+    return jinja2.Environment(loader=loader,  # nosec B701
+                              autoescape=jinja2.select_autoescape())
+
+
+@functools.lru_cache()
+def _get_file_jinja_environment(tmpl_path):
+    """Returns a Jinja2 environment for templates in the given directory.
+
+    The environment is cached, so that each template file is only parsed
+    and compiled once. Jinja2 reloads a template when its file changes.
+
+    :param tmpl_path: the directory holding the template files.
+    """
+    return _get_jinja_environment(jinja2.FileSystemLoader(tmpl_path))
+
+
 def render_template(template, params, is_file=True):
     """Renders Jinja2 template file with given parameters.
 
@@ -478,16 +529,11 @@ def render_template(template, params, is_file=True):
     """
     if is_file:
         tmpl_path, tmpl_name = os.path.split(template)
-        loader = jinja2.FileSystemLoader(tmpl_path)
+        env = _get_file_jinja_environment(tmpl_path)
     else:
         tmpl_name = 'template'
-        loader = jinja2.DictLoader({tmpl_name: template})
-    # NOTE(pas-ha) bandit does not seem to cope with such syntaxis
-    # and still complains with B701 for that line
-    # NOTE(pas-ha) not using default_for_string=False as we set the name
-    # of the template above for strings too.
-    env = jinja2.Environment(loader=loader,  # nosec B701
-                             autoescape=jinja2.select_autoescape())
+        env = _get_jinja_environment(
+            jinja2.DictLoader({tmpl_name: template}))
     tmpl = env.get_template(tmpl_name)
     return tmpl.render(params, enumerate=enumerate)
 
@@ -161,6 +161,13 @@ BOOT_DEVICE_HEXA_MAP = {
     boot_devices.SAFE: '0x0c'
 }
 
+# Raw "Set System Boot Options" commands (boot flags parameter, valid +
+# persistent + EFI) used to set a persistent boot device in UEFI mode.
+_UEFI_PERSISTENT_BOOT_DEVICE_RAW_CMDS = {
+    device: '0x00 0x08 0x05 0xe0 %s 0x00 0x00 0x00' % hexa
+    for device, hexa in BOOT_DEVICE_HEXA_MAP.items()
+}
+
 
 def _check_option_support(options):
     """Checks if the specific ipmitool options are supported on host.
@@ -991,7 +998,7 @@ class IPMIManagement(base.ManagementInterface):
         :raises: IPMIFailure on an error from ipmitool.
 
         """
-        if device not in self.get_supported_boot_devices(task):
+        if device not in BOOT_DEVICE_HEXA_MAP:
             raise exception.InvalidParameterValue(_(
                 "Invalid boot device %s specified.") % device)
 
@@ -1039,9 +1046,7 @@ class IPMIManagement(base.ManagementInterface):
         # https://bugs.launchpad.net/ironic/+bug/1611306
         boot_mode = boot_mode_utils.get_boot_mode(task.node)
         if persistent and boot_mode == 'uefi':
-            raw_cmd = ('0x00 0x08 0x05 0xe0 %s 0x00 0x00 0x00' %
-                       BOOT_DEVICE_HEXA_MAP[device])
-            send_raw(task, raw_cmd)
+            send_raw(task, _UEFI_PERSISTENT_BOOT_DEVICE_RAW_CMDS[device])
             return
 
         options = []
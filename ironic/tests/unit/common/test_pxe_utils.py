@@ -261,16 +261,16 @@ class TestPXEUtils(db_base.DbTestCase):
 
         self.assertEqual(str(expected_template), rendered_template)
 
-    @mock.patch('ironic.common.utils.create_link_without_raise', autospec=True)
-    @mock.patch('ironic_lib.utils.unlink_without_raise', autospec=True)
-    def test__write_mac_pxe_configs(self, unlink_mock, create_link_mock):
+    @mock.patch('ironic.common.utils.replace_link_without_raise',
+                autospec=True)
+    def test__write_mac_pxe_configs(self, replace_link_mock):
         port_1 = object_utils.create_test_port(
             self.context, node_id=self.node.id,
             address='11:22:33:44:55:66', uuid=uuidutils.generate_uuid())
         port_2 = object_utils.create_test_port(
             self.context, node_id=self.node.id,
             address='11:22:33:44:55:67', uuid=uuidutils.generate_uuid())
-        create_link_calls = [
+        replace_link_calls = [
             mock.call(u'../1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/tftpboot/pxelinux.cfg/01-11-22-33-44-55-66'),
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
@@ -280,23 +280,15 @@ class TestPXEUtils(db_base.DbTestCase):
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/tftpboot/11:22:33:44:55:67.conf')
         ]
-        unlink_calls = [
-            mock.call('/tftpboot/pxelinux.cfg/01-11-22-33-44-55-66'),
-            mock.call('/tftpboot/11:22:33:44:55:66.conf'),
-            mock.call('/tftpboot/pxelinux.cfg/01-11-22-33-44-55-67'),
-            mock.call('/tftpboot/11:22:33:44:55:67.conf')
-        ]
         with task_manager.acquire(self.context, self.node.uuid) as task:
             task.ports = [port_1, port_2]
             pxe_utils._link_mac_pxe_configs(task)
 
-        unlink_mock.assert_has_calls(unlink_calls)
-        create_link_mock.assert_has_calls(create_link_calls)
+        replace_link_mock.assert_has_calls(replace_link_calls)
 
-    @mock.patch('ironic.common.utils.create_link_without_raise', autospec=True)
-    @mock.patch('ironic_lib.utils.unlink_without_raise', autospec=True)
-    def test__write_infiniband_mac_pxe_configs(
-            self, unlink_mock, create_link_mock):
+    @mock.patch('ironic.common.utils.replace_link_without_raise',
+                autospec=True)
+    def test__write_infiniband_mac_pxe_configs(self, replace_link_mock):
         client_id1 = (
             '20:00:55:04:01:fe:80:00:00:00:00:00:00:00:02:c9:02:00:23:13:92')
         port_1 = object_utils.create_test_port(
@@ -309,7 +301,7 @@ class TestPXEUtils(db_base.DbTestCase):
             self.context, node_id=self.node.id,
             address='11:22:33:44:55:67', uuid=uuidutils.generate_uuid(),
             extra={'client-id': client_id2})
-        create_link_calls = [
+        replace_link_calls = [
             mock.call(u'../1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/tftpboot/pxelinux.cfg/20-11-22-33-44-55-66'),
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
@@ -319,29 +311,22 @@ class TestPXEUtils(db_base.DbTestCase):
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/tftpboot/11:22:33:44:55:67.conf')
         ]
-        unlink_calls = [
-            mock.call('/tftpboot/pxelinux.cfg/20-11-22-33-44-55-66'),
-            mock.call('/tftpboot/11:22:33:44:55:66.conf'),
-            mock.call('/tftpboot/pxelinux.cfg/20-11-22-33-44-55-67'),
-            mock.call('/tftpboot/11:22:33:44:55:67.conf')
-        ]
         with task_manager.acquire(self.context, self.node.uuid) as task:
             task.ports = [port_1, port_2]
             pxe_utils._link_mac_pxe_configs(task)
 
-        unlink_mock.assert_has_calls(unlink_calls)
-        create_link_mock.assert_has_calls(create_link_calls)
+        replace_link_mock.assert_has_calls(replace_link_calls)
 
-    @mock.patch('ironic.common.utils.create_link_without_raise', autospec=True)
-    @mock.patch('ironic_lib.utils.unlink_without_raise', autospec=True)
-    def test__write_mac_ipxe_configs(self, unlink_mock, create_link_mock):
+    @mock.patch('ironic.common.utils.replace_link_without_raise',
+                autospec=True)
+    def test__write_mac_ipxe_configs(self, replace_link_mock):
         port_1 = object_utils.create_test_port(
             self.context, node_id=self.node.id,
             address='11:22:33:44:55:66', uuid=uuidutils.generate_uuid())
         port_2 = object_utils.create_test_port(
             self.context, node_id=self.node.id,
             address='11:22:33:44:55:67', uuid=uuidutils.generate_uuid())
-        create_link_calls = [
+        replace_link_calls = [
             mock.call(u'../1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/httpboot/pxelinux.cfg/11-22-33-44-55-66'),
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
@@ -351,46 +336,51 @@ class TestPXEUtils(db_base.DbTestCase):
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       '/httpboot/11:22:33:44:55:67.conf')
         ]
-        unlink_calls = [
-            mock.call('/httpboot/pxelinux.cfg/11-22-33-44-55-66'),
-            mock.call('/httpboot/11:22:33:44:55:66.conf'),
-            mock.call('/httpboot/pxelinux.cfg/11-22-33-44-55-67'),
-            mock.call('/httpboot/11:22:33:44:55:67.conf'),
-        ]
         with task_manager.acquire(self.context, self.node.uuid) as task:
             task.ports = [port_1, port_2]
             pxe_utils._link_mac_pxe_configs(task, ipxe_enabled=True)
 
-        unlink_mock.assert_has_calls(unlink_calls)
-        create_link_mock.assert_has_calls(create_link_calls)
+        replace_link_mock.assert_has_calls(replace_link_calls)
 
-    @mock.patch('ironic.common.utils.create_link_without_raise', autospec=True)
-    @mock.patch('ironic_lib.utils.unlink_without_raise', autospec=True)
+    @mock.patch('ironic.common.utils.replace_link_without_raise',
+                autospec=True)
     @mock.patch('ironic.common.dhcp_factory.DHCPFactory.provider',
                 autospec=True)
-    def test__link_ip_address_pxe_configs(self, provider_mock, unlink_mock,
-                                          create_link_mock):
+    def test__link_ip_address_pxe_configs(self, provider_mock,
+                                          replace_link_mock):
         ip_address = '10.10.0.1'
         address = "aa:aa:aa:aa:aa:aa"
         object_utils.create_test_port(self.context, node_id=self.node.id,
                                       address=address)
 
         provider_mock.get_ip_addresses.return_value = [ip_address]
-        create_link_calls = [
+        replace_link_calls = [
             mock.call(u'1be26c0b-03f2-4d2e-ae87-c02d7f33c123/config',
                       u'/tftpboot/10.10.0.1.conf'),
         ]
         with task_manager.acquire(self.context, self.node.uuid) as task:
             pxe_utils._link_ip_address_pxe_configs(task, False)
 
-        unlink_mock.assert_called_once_with('/tftpboot/10.10.0.1.conf')
-        create_link_mock.assert_has_calls(create_link_calls)
+        replace_link_mock.assert_has_calls(replace_link_calls)
+
+    @mock.patch('ironic.common.utils.replace_link_without_raise',
+                autospec=True)
+    @mock.patch('ironic.common.dhcp_factory.DHCPFactory.provider',
+                autospec=True)
+    def test__link_ip_address_pxe_configs_no_dhcp(self, provider_mock,
+                                                  replace_link_mock):
+        self.config(dhcp_provider='none', group='dhcp')
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            pxe_utils._link_ip_address_pxe_configs(task, False)
+
+        self.assertFalse(provider_mock.get_ip_addresses.called)
+        self.assertFalse(replace_link_mock.called)
 
     @mock.patch.object(os, 'chmod', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
-    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
-    def test_create_pxe_config(self, ensure_tree_mock, render_mock,
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    def test_create_pxe_config(self, mkdir_mock, render_mock,
                                write_mock, chmod_mock):
         with task_manager.acquire(self.context, self.node.uuid) as task:
             pxe_utils.create_pxe_config(task, self.pxe_options,
@@ -403,10 +393,10 @@ class TestPXEUtils(db_base.DbTestCase):
             )
         node_dir = os.path.join(CONF.pxe.tftp_root, self.node.uuid)
         pxe_dir = os.path.join(CONF.pxe.tftp_root, 'pxelinux.cfg')
-        ensure_calls = [
+        mkdir_calls = [
             mock.call(node_dir), mock.call(pxe_dir),
         ]
-        ensure_tree_mock.assert_has_calls(ensure_calls)
+        mkdir_mock.assert_has_calls(mkdir_calls)
         chmod_mock.assert_not_called()
 
         pxe_cfg_file_path = pxe_utils.get_pxe_config_file_path(self.node.uuid)
@@ -416,8 +406,8 @@ class TestPXEUtils(db_base.DbTestCase):
     @mock.patch.object(os, 'chmod', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
-    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
-    def test_create_pxe_config_set_dir_permission(self, ensure_tree_mock,
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    def test_create_pxe_config_set_dir_permission(self, mkdir_mock,
                                                   render_mock,
                                                   write_mock, chmod_mock):
         self.config(dir_permission=0o755, group='pxe')
@@ -432,10 +422,10 @@ class TestPXEUtils(db_base.DbTestCase):
             )
         node_dir = os.path.join(CONF.pxe.tftp_root, self.node.uuid)
         pxe_dir = os.path.join(CONF.pxe.tftp_root, 'pxelinux.cfg')
-        ensure_calls = [
+        mkdir_calls = [
             mock.call(node_dir), mock.call(pxe_dir),
         ]
-        ensure_tree_mock.assert_has_calls(ensure_calls)
+        mkdir_mock.assert_has_calls(mkdir_calls)
         chmod_calls = [mock.call(node_dir, 0o755), mock.call(pxe_dir, 0o755)]
         chmod_mock.assert_has_calls(chmod_calls)
 
@@ -443,7 +433,7 @@ class TestPXEUtils(db_base.DbTestCase):
         write_mock.assert_called_with(pxe_cfg_file_path,
                                       render_mock.return_value)
 
-    @mock.patch.object(os.path, 'isdir', autospec=True)
+    @mock.patch.object(os, 'mkdir', autospec=True)
     @mock.patch.object(os, 'chmod', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
@@ -451,10 +441,10 @@ class TestPXEUtils(db_base.DbTestCase):
     def test_create_pxe_config_existing_dirs(self, ensure_tree_mock,
                                              render_mock,
                                              write_mock, chmod_mock,
-                                             isdir_mock):
+                                             mkdir_mock):
         self.config(dir_permission=0o755, group='pxe')
+        mkdir_mock.side_effect = FileExistsError
         with task_manager.acquire(self.context, self.node.uuid) as task:
-            isdir_mock.return_value = True
             pxe_utils.create_pxe_config(task, self.pxe_options,
                                         CONF.pxe.pxe_config_template)
             render_mock.assert_called_with(
@@ -463,20 +453,41 @@ class TestPXEUtils(db_base.DbTestCase):
                  'ROOT': '{{ ROOT }}',
                  'DISK_IDENTIFIER': '{{ DISK_IDENTIFIER }}'}
             )
-        ensure_tree_mock.assert_has_calls([])
+        self.assertEqual(2, mkdir_mock.call_count)
+        ensure_tree_mock.assert_not_called()
         chmod_mock.assert_not_called()
-        isdir_mock.assert_has_calls([])
         pxe_cfg_file_path = pxe_utils.get_pxe_config_file_path(self.node.uuid)
         write_mock.assert_called_with(pxe_cfg_file_path,
                                       render_mock.return_value)
 
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    @mock.patch.object(os, 'chmod', autospec=True)
+    @mock.patch('ironic.common.utils.write_to_file', autospec=True)
+    @mock.patch('ironic.common.utils.render_template', autospec=True)
+    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
+    def test_create_pxe_config_missing_root_dir(self, ensure_tree_mock,
+                                                render_mock,
+                                                write_mock, chmod_mock,
+                                                mkdir_mock):
+        self.config(dir_permission=0o755, group='pxe')
+        mkdir_mock.side_effect = FileNotFoundError
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            pxe_utils.create_pxe_config(task, self.pxe_options,
+                                        CONF.pxe.pxe_config_template)
+        node_dir = os.path.join(CONF.pxe.tftp_root, self.node.uuid)
+        pxe_dir = os.path.join(CONF.pxe.tftp_root, 'pxelinux.cfg')
+        ensure_tree_mock.assert_has_calls([mock.call(node_dir),
+                                           mock.call(pxe_dir)])
+        chmod_mock.assert_has_calls([mock.call(node_dir, 0o755),
+                                     mock.call(pxe_dir, 0o755)])
+
     @mock.patch.object(os, 'chmod', autospec=True)
     @mock.patch('ironic.common.pxe_utils._link_ip_address_pxe_configs',
                 autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
-    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
-    def test_create_pxe_config_uefi_grub(self, ensure_tree_mock, render_mock,
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    def test_create_pxe_config_uefi_grub(self, mkdir_mock, render_mock,
                                          write_mock, link_ip_configs_mock,
                                          chmod_mock):
         grub_tmplte = "ironic/drivers/modules/pxe_grub_config.template"
@@ -485,11 +496,11 @@ class TestPXEUtils(db_base.DbTestCase):
             pxe_utils.create_pxe_config(task, self.pxe_options,
                                         grub_tmplte)
 
-            ensure_calls = [
+            mkdir_calls = [
                 mock.call(os.path.join(CONF.pxe.tftp_root, self.node.uuid)),
                 mock.call(os.path.join(CONF.pxe.tftp_root, 'pxelinux.cfg')),
             ]
-            ensure_tree_mock.assert_has_calls(ensure_calls)
+            mkdir_mock.assert_has_calls(mkdir_calls)
             chmod_mock.assert_not_called()
             render_mock.assert_called_with(
                 grub_tmplte,
@@ -509,27 +520,25 @@ class TestPXEUtils(db_base.DbTestCase):
                 autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
-    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
+    @mock.patch.object(os, 'mkdir', autospec=True)
     def test_create_pxe_config_uefi_mac_address(
-            self, ensure_tree_mock, render_mock,
+            self, mkdir_mock, render_mock,
             write_mock, link_ip_configs_mock,
             link_mac_pxe_configs_mock, chmod_mock):
         # TODO(TheJulia): We should... like... fix the template to
         # enable mac address usage.....
         grub_tmplte = "ironic/drivers/modules/pxe_grub_config.template"
         self.config(dhcp_provider='none', group='dhcp')
-        link_ip_configs_mock.side_effect = \
-            exception.FailedToGetIPAddressOnPort(port_id='blah')
         with task_manager.acquire(self.context, self.node.uuid) as task:
             task.node.properties['capabilities'] = 'boot_mode:uefi'
             pxe_utils.create_pxe_config(task, self.pxe_options,
                                         grub_tmplte)
 
-            ensure_calls = [
+            mkdir_calls = [
                 mock.call(os.path.join(CONF.pxe.tftp_root, self.node.uuid)),
                 mock.call(os.path.join(CONF.pxe.tftp_root, 'pxelinux.cfg')),
             ]
-            ensure_tree_mock.assert_has_calls(ensure_calls)
+            mkdir_mock.assert_has_calls(mkdir_calls)
             chmod_mock.assert_not_called()
             render_mock.assert_called_with(
                 grub_tmplte,
@@ -544,12 +553,38 @@ class TestPXEUtils(db_base.DbTestCase):
         write_mock.assert_called_with(pxe_cfg_file_path,
                                       render_mock.return_value)
 
+    @mock.patch.object(pxe_utils.LOG, 'error', autospec=True)
+    @mock.patch.object(os, 'chmod', autospec=True)
+    @mock.patch('ironic.common.pxe_utils._link_mac_pxe_configs',
+                autospec=True)
+    @mock.patch('ironic.common.pxe_utils._link_ip_address_pxe_configs',
+                autospec=True)
+    @mock.patch('ironic.common.utils.write_to_file', autospec=True)
+    @mock.patch('ironic.common.utils.render_template', autospec=True)
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    def test_create_pxe_config_uefi_ip_address_fail(
+            self, mkdir_mock, render_mock,
+            write_mock, link_ip_configs_mock,
+            link_mac_pxe_configs_mock, chmod_mock, log_mock):
+        grub_tmplte = "ironic/drivers/modules/pxe_grub_config.template"
+        link_ip_configs_mock.side_effect = \
+            exception.FailedToGetIPAddressOnPort(port_id='blah')
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            task.node.properties['capabilities'] = 'boot_mode:uefi'
+            self.assertRaises(exception.FailedToGetIPAddressOnPort,
+                              pxe_utils.create_pxe_config,
+                              task, self.pxe_options, grub_tmplte)
+            link_mac_pxe_configs_mock.assert_called_once_with(
+                task, ipxe_enabled=False)
+            link_ip_configs_mock.assert_called_once_with(task, False)
+        self.assertTrue(log_mock.called)
+
     @mock.patch.object(os, 'chmod', autospec=True)
     @mock.patch('ironic.common.pxe_utils._link_mac_pxe_configs', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
-    @mock.patch('oslo_utils.fileutils.ensure_tree', autospec=True)
-    def test_create_pxe_config_uefi_ipxe(self, ensure_tree_mock, render_mock,
+    @mock.patch.object(os, 'mkdir', autospec=True)
+    def test_create_pxe_config_uefi_ipxe(self, mkdir_mock, render_mock,
                                          write_mock, link_mac_pxe_mock,
                                          chmod_mock):
         ipxe_template = "ironic/drivers/modules/ipxe_config.template"
@@ -558,11 +593,11 @@ class TestPXEUtils(db_base.DbTestCase):
             pxe_utils.create_pxe_config(task, self.ipxe_options,
                                         ipxe_template, ipxe_enabled=True)
 
-            ensure_calls = [
+            mkdir_calls = [
                 mock.call(os.path.join(CONF.deploy.http_root, self.node.uuid)),
                 mock.call(os.path.join(CONF.deploy.http_root, 'pxelinux.cfg')),
             ]
-            ensure_tree_mock.assert_has_calls(ensure_calls)
+            mkdir_mock.assert_has_calls(mkdir_calls)
             chmod_mock.assert_not_called()
             render_mock.assert_called_with(
                 ipxe_template,
@@ -596,12 +631,13 @@ class TestPXEUtils(db_base.DbTestCase):
         rmtree_mock.assert_called_once_with(
             os.path.join(CONF.pxe.tftp_root, self.node.uuid))
 
-    @mock.patch.object(os.path, 'isfile', lambda path: False)
+    @mock.patch.object(os, 'stat', autospec=True)
     @mock.patch('ironic.common.utils.file_has_content', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
     def test_create_ipxe_boot_script(self, render_mock, write_mock,
-                                     file_has_content_mock):
+                                     file_has_content_mock, stat_mock):
+        stat_mock.side_effect = FileNotFoundError
         render_mock.return_value = 'foo'
         pxe_utils.create_ipxe_boot_script()
         self.assertFalse(file_has_content_mock.called)
@@ -613,12 +649,13 @@ class TestPXEUtils(db_base.DbTestCase):
             CONF.pxe.ipxe_boot_script,
             {'ipxe_for_mac_uri': 'pxelinux.cfg/'})
 
-    @mock.patch.object(os.path, 'isfile', lambda path: True)
+    @mock.patch.object(os, 'stat', autospec=True)
     @mock.patch('ironic.common.utils.file_has_content', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
     def test_create_ipxe_boot_script_copy_file_different(
-            self, render_mock, write_mock, file_has_content_mock):
+            self, render_mock, write_mock, file_has_content_mock, stat_mock):
+        stat_mock.return_value = mock.Mock(st_size=3)
         file_has_content_mock.return_value = False
         render_mock.return_value = 'foo'
         pxe_utils.create_ipxe_boot_script()
@@ -634,14 +671,32 @@ class TestPXEUtils(db_base.DbTestCase):
             CONF.pxe.ipxe_boot_script,
             {'ipxe_for_mac_uri': 'pxelinux.cfg/'})
 
-    @mock.patch.object(os.path, 'isfile', lambda path: True)
+    @mock.patch.object(os, 'stat', autospec=True)
+    @mock.patch('ironic.common.utils.file_has_content', autospec=True)
+    @mock.patch('ironic.common.utils.write_to_file', autospec=True)
+    @mock.patch('ironic.common.utils.render_template', autospec=True)
+    def test_create_ipxe_boot_script_copy_file_size_different(
+            self, render_mock, write_mock, file_has_content_mock, stat_mock):
+        stat_mock.return_value = mock.Mock(st_size=42)
+        render_mock.return_value = 'foo'
+        pxe_utils.create_ipxe_boot_script()
+        self.assertFalse(file_has_content_mock.called)
+        write_mock.assert_called_once_with(
+            os.path.join(CONF.deploy.http_root,
+                         os.path.basename(CONF.pxe.ipxe_boot_script)),
+            'foo')
+
+    @mock.patch.object(os, 'stat', autospec=True)
     @mock.patch('ironic.common.utils.file_has_content', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
     def test_create_ipxe_boot_script_already_exists(self, render_mock,
                                                     write_mock,
-                                                    file_has_content_mock):
+                                                    file_has_content_mock,
+                                                    stat_mock):
+        stat_mock.return_value = mock.Mock(st_size=3)
         file_has_content_mock.return_value = True
+        render_mock.return_value = 'foo'
         pxe_utils.create_ipxe_boot_script()
         self.assertFalse(write_mock.called)
 
@@ -656,11 +711,35 @@ class TestPXEUtils(db_base.DbTestCase):
         self.assertEqual('/httpboot/pxelinux.cfg/00-11-22-33-aa-bb-cc',
                          pxe_utils._get_pxe_mac_path(mac, ipxe_enabled=True))
 
+    def test__get_pxe_mac_path_with_trailing_slash(self):
+        self.config(tftp_root='/tftpboot/', group='pxe')
+        mac = '00:11:22:33:44:55:66'
+        self.assertEqual('/tftpboot/pxelinux.cfg/01-00-11-22-33-44-55-66',
+                         pxe_utils._get_pxe_mac_path(mac))
+
+    def test__get_pxe_mac_path_ipxe_with_trailing_slash(self):
+        self.config(http_root='/httpboot/', group='deploy')
+        mac = '00:11:22:33:AA:BB:CC'
+        self.assertEqual('/httpboot/pxelinux.cfg/00-11-22-33-aa-bb-cc',
+                         pxe_utils._get_pxe_mac_path(mac, ipxe_enabled=True))
+
+    def test__get_pxe_mac_path_root_dir(self):
+        mac = '00:11:22:33:44:55:66'
+        self.assertEqual('/srv/tftp/pxelinux.cfg/01-00-11-22-33-44-55-66',
+                         pxe_utils._get_pxe_mac_path(mac,
+                                                     root_dir='/srv/tftp'))
+
     def test__get_pxe_ip_address_path(self):
         ipaddress = '10.10.0.1'
         self.assertEqual('/tftpboot/10.10.0.1.conf',
                          pxe_utils._get_pxe_ip_address_path(ipaddress))
 
+    def test__get_pxe_ip_address_path_with_trailing_slash(self):
+        self.config(tftp_root='/tftpboot/', group='pxe')
+        ipaddress = '10.10.0.1'
+        self.assertEqual('/tftpboot/10.10.0.1.conf',
+                         pxe_utils._get_pxe_ip_address_path(ipaddress))
+
     def test_get_root_dir(self):
         expected_dir = '/tftproot'
         self.config(tftp_root=expected_dir, group='pxe')
@@ -672,6 +751,11 @@ class TestPXEUtils(db_base.DbTestCase):
                                       'config'),
                          pxe_utils.get_pxe_config_file_path(self.node.uuid))
 
+    def test_get_pxe_config_file_path_with_trailing_slash(self):
+        self.config(tftp_root='/tftpboot/', group='pxe')
+        self.assertEqual('/tftpboot/%s/config' % self.node.uuid,
+                         pxe_utils.get_pxe_config_file_path(self.node.uuid))
+
     def _dhcp_options_for_instance(self, ip_version=4, ipxe=False):
         self.config(ip_version=ip_version, group='pxe')
         if ip_version == 4:
@@ -721,6 +805,22 @@ class TestPXEUtils(db_base.DbTestCase):
         self.config(tftp_server='ff80::1', group='pxe')
         self._dhcp_options_for_instance(ip_version=6)
 
+    @mock.patch.object(pxe_utils, 'dhcp_options_for_instance', autospec=True)
+    def test_dhcp_options_for_instance_all_versions(self, dhcp_opts_mock):
+        v4_opts = [{'opt_name': '67', 'ip_version': 4}]
+        v6_opts = [{'opt_name': '59', 'ip_version': 6}]
+        dhcp_opts_mock.side_effect = [v4_opts, v6_opts]
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            result = pxe_utils.dhcp_options_for_instance_all_versions(
+                task, ipxe_enabled=True)
+            dhcp_opts_mock.assert_has_calls([
+                mock.call(task, ipxe_enabled=True, url_boot=False,
+                          ip_version=4),
+                mock.call(task, ipxe_enabled=True, url_boot=False,
+                          ip_version=6)])
+        self.assertEqual([{'opt_name': '67', 'ip_version': 4},
+                          {'opt_name': '59', 'ip_version': 6}], result)
+
     def _test_get_kernel_ramdisk_info(self, expected_dir, mode='deploy',
                                       ipxe_enabled=False):
         node_uuid = 'fake-node'
@@ -852,6 +952,31 @@ class TestPXEUtils(db_base.DbTestCase):
             rmtree_mock.assert_called_once_with(
                 os.path.join(CONF.pxe.tftp_root, self.node.uuid))
 
+    @mock.patch('ironic.common.utils.rmtree_without_raise', autospec=True)
+    @mock.patch('ironic_lib.utils.unlink_without_raise', autospec=True)
+    @mock.patch('ironic.common.dhcp_factory.DHCPFactory.provider',
+                autospec=True)
+    def test_clean_up_pxe_config_uefi_no_dhcp(self, provider_mock,
+                                              unlink_mock, rmtree_mock):
+        self.config(dhcp_provider='none', group='dhcp')
+        address = "aa:aa:aa:aa:aa:aa"
+        properties = {'capabilities': 'boot_mode:uefi'}
+        object_utils.create_test_port(self.context, node_id=self.node.id,
+                                      address=address)
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            task.node.properties = properties
+            pxe_utils.clean_up_pxe_config(task)
+
+            self.assertFalse(provider_mock.get_ip_addresses.called)
+            unlink_calls = [
+                mock.call('/tftpboot/pxelinux.cfg/01-aa-aa-aa-aa-aa-aa'),
+                mock.call('/tftpboot/' + address + '.conf')
+            ]
+            unlink_mock.assert_has_calls(unlink_calls)
+            rmtree_mock.assert_called_once_with(
+                os.path.join(CONF.pxe.tftp_root, self.node.uuid))
+
     def test_get_tftp_path_prefix_with_trailing_slash(self):
         self.config(tftp_root='/tftpboot-path/', group='pxe')
         path_prefix = pxe_utils.get_tftp_path_prefix()
@@ -1098,8 +1223,8 @@ class PXEInterfacesTestCase(db_base.DbTestCase):
 
         mock_fetch_image.assert_called_once_with(self.context,
                                                  mock.ANY,
-                                                 [('deploy_kernel',
-                                                   image_path)],
+                                                 (('deploy_kernel',
+                                                   image_path),),
                                                  True)
 
     @mock.patch.object(pxe_utils, 'TFTPImageCache', lambda: None)
@@ -1113,7 +1238,7 @@ class PXEInterfacesTestCase(db_base.DbTestCase):
             pxe_utils.cache_ramdisk_kernel(task, fake_pxe_info)
         mock_ensure_tree.assert_called_with(expected_path)
         mock_fetch_image.assert_called_once_with(
-            self.context, mock.ANY, list(fake_pxe_info.values()), True)
+            self.context, mock.ANY, tuple(fake_pxe_info.values()), True)
 
     @mock.patch.object(pxe_utils, 'TFTPImageCache', lambda: None)
     @mock.patch.object(fileutils, 'ensure_tree', autospec=True)
@@ -1129,7 +1254,7 @@ class PXEInterfacesTestCase(db_base.DbTestCase):
                                            ipxe_enabled=True)
         mock_ensure_tree.assert_called_with(expected_path)
         mock_fetch_image.assert_called_once_with(self.context, mock.ANY,
-                                                 list(fake_pxe_info.values()),
+                                                 tuple(fake_pxe_info.values()),
                                                  True)
 
     @mock.patch.object(pxe_utils.LOG, 'error', autospec=True)
@@ -1752,6 +1877,28 @@ class iPXEBuildConfigOptionsTestCase(db_base.DbTestCase):
             options = pxe_utils.get_volume_pxe_options(task)
         self.assertEqual([], options['iscsi_volumes'])
 
+    def test__generate_iscsi_url_ipv6(self):
+        properties = {'target_lun': 0,
+                      'target_portal': '[fe80::1]:3260',
+                      'target_iqn': 'fake_iqn'}
+        self.assertEqual('iscsi:[fe80::1]::3260:0:fake_iqn',
+                         pxe_utils._generate_iscsi_url(properties))
+
+    def test__generate_iscsi_url_no_port(self):
+        properties = {'target_lun': 0,
+                      'target_portal': 'fake_host',
+                      'target_iqn': 'fake_iqn'}
+        self.assertEqual('iscsi:fake_host:::0:fake_iqn',
+                         pxe_utils._generate_iscsi_url(properties))
+
+    def test__generate_iscsi_url_ipv6_invalid(self):
+        for portal in ('[fe80::1]', 'fe80::1', 'fe80::1:3260'):
+            properties = {'target_lun': 0,
+                          'target_portal': portal,
+                          'target_iqn': 'fake_iqn'}
+            self.assertRaises(ValueError, pxe_utils._generate_iscsi_url,
+                              properties)
+
     def test_build_pxe_config_options_ipxe_rescue(self):
         self._test_build_pxe_config_options_ipxe(mode='rescue')
 
@@ -21,6 +21,7 @@ import shutil
 import tempfile
 from unittest import mock
 
+from ironic_lib import utils as ironic_utils
 import jinja2
 from oslo_concurrency import processutils
 from oslo_config import cfg
@@ -47,6 +48,41 @@ class BareMetalUtilsTestCase(base.TestCase):
             utils.create_link_without_raise("/fake/source", "/fake/link")
             symlink_mock.assert_called_once_with("/fake/source", "/fake/link")
 
+    @mock.patch.object(os, 'replace', autospec=True)
+    @mock.patch.object(os, 'unlink', autospec=True)
+    @mock.patch.object(os, 'symlink', autospec=True)
+    def test_replace_link(self, symlink_mock, unlink_mock, replace_mock):
+        utils.replace_link_without_raise("/fake/source", "/fake/link")
+        symlink_mock.assert_called_once_with("/fake/source",
+                                             "/fake/link.tmp")
+        replace_mock.assert_called_once_with("/fake/link.tmp", "/fake/link")
+        self.assertFalse(unlink_mock.called)
+
+    @mock.patch.object(os, 'replace', autospec=True)
+    @mock.patch.object(os, 'unlink', autospec=True)
+    @mock.patch.object(os, 'symlink', autospec=True)
+    def test_replace_link_stale_tmp(self, symlink_mock, unlink_mock,
+                                    replace_mock):
+        symlink_mock.side_effect = [FileExistsError, None]
+        utils.replace_link_without_raise("/fake/source", "/fake/link")
+        symlink_mock.assert_has_calls(
+            [mock.call("/fake/source", "/fake/link.tmp")] * 2)
+        unlink_mock.assert_called_once_with("/fake/link.tmp")
+        replace_mock.assert_called_once_with("/fake/link.tmp", "/fake/link")
+
+    @mock.patch.object(utils.LOG, 'warning', autospec=True)
+    @mock.patch.object(ironic_utils, 'unlink_without_raise', autospec=True)
+    @mock.patch.object(os, 'replace', autospec=True)
+    @mock.patch.object(os, 'symlink', autospec=True)
+    def test_replace_link_error(self, symlink_mock, replace_mock,
+                                unlink_mock, log_mock):
+        replace_mock.side_effect = OSError(errno.EACCES, 'denied')
+        utils.replace_link_without_raise("/fake/source", "/fake/link")
+        symlink_mock.assert_called_once_with("/fake/source",
+                                             "/fake/link.tmp")
+        unlink_mock.assert_called_once_with("/fake/link.tmp")
+        self.assertTrue(log_mock.called)
+
 
 class ExecuteTestCase(base.TestCase):
 
@@ -528,6 +564,8 @@ class JinjaTemplatingTestCase(base.TestCase):
         self.template = '{{ foo }} {{ bar }}'
         self.params = {'foo': 'spam', 'bar': 'ham'}
         self.expected = 'spam ham'
+        utils._get_file_jinja_environment.cache_clear()
+        self.addCleanup(utils._get_file_jinja_environment.cache_clear)
 
     def test_render_string(self):
         self.assertEqual(self.expected,
@@ -554,6 +592,18 @@ class JinjaTemplatingTestCase(base.TestCase):
                                                self.params))
         jinja_fsl_mock.assert_called_once_with('/path/to')
 
+    @mock.patch('ironic.common.utils.jinja2.FileSystemLoader', autospec=True)
+    def test_render_file_cached_environment(self, jinja_fsl_mock):
+        jinja_fsl_mock.return_value = jinja2.DictLoader(
+            {'template.j2': self.template, 'other.j2': '{{ foo }}'})
+        self.assertEqual(self.expected,
+                         utils.render_template('/path/to/template.j2',
+                                               self.params))
+        self.assertEqual('spam',
+                         utils.render_template('/path/to/other.j2',
+                                               self.params))
+        jinja_fsl_mock.assert_called_once_with('/path/to')
+
 
 class ValidateConductorGroupTestCase(base.TestCase):
     def test_validate_conductor_group_success(self):
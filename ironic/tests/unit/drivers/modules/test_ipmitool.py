@@ -2192,15 +2192,26 @@ class IPMIToolDriverTestCase(Base):
             self, mock_exec, mock_boot_mode):
         mock_boot_mode.return_value = 'uefi'
         mock_exec.return_value = [None, None]
+        # boot device, expected raw command
+        params = [
+            (boot_devices.PXE, "raw 0x00 0x08 0x05 0xe0 0x04 0x00 0x00 0x00"),
+            (boot_devices.DISK, "raw 0x00 0x08 0x05 0xe0 0x08 0x00 0x00 0x00"),
+            (boot_devices.CDROM,
+             "raw 0x00 0x08 0x05 0xe0 0x14 0x00 0x00 0x00"),
+            (boot_devices.BIOS, "raw 0x00 0x08 0x05 0xe0 0x18 0x00 0x00 0x00"),
+            (boot_devices.SAFE, "raw 0x00 0x08 0x05 0xe0 0x0c 0x00 0x00 0x00"),
+        ]
 
         with task_manager.acquire(self.context, self.node.uuid) as task:
-            self.management.set_boot_device(task, boot_devices.PXE,
-                                            persistent=True)
-        mock_calls = [
-            mock.call(self.info, "raw 0x00 0x08 0x03 0x08"),
-            mock.call(self.info, "raw 0x00 0x08 0x05 0xe0 0x04 0x00 0x00 0x00")
-        ]
-        mock_exec.assert_has_calls(mock_calls)
+            for device, raw_cmd in params:
+                mock_exec.reset_mock()
+                self.management.set_boot_device(task, device,
+                                                persistent=True)
+                mock_calls = [
+                    mock.call(self.info, "raw 0x00 0x08 0x03 0x08"),
+                    mock.call(self.info, raw_cmd)
+                ]
+                mock_exec.assert_has_calls(mock_calls)
 
     def test_management_interface_get_supported_boot_devices(self):
         with task_manager.acquire(self.context, self.node.uuid) as task:
@@ -430,7 +430,7 @@ class iPXEBootTestCase(db_base.DbTestCase):
         self.node.save()
         self._test_prepare_ramdisk(uefi=True)
 
-    @mock.patch.object(os.path, 'isfile', lambda path: True)
+    @mock.patch.object(os, 'stat', lambda path: mock.Mock(st_size=3))
     @mock.patch.object(common_utils, 'file_has_content', lambda *args: False)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
@@ -449,12 +449,13 @@ class iPXEBootTestCase(db_base.DbTestCase):
             CONF.pxe.ipxe_boot_script,
             {'ipxe_for_mac_uri': 'pxelinux.cfg/'})
 
-    @mock.patch.object(os.path, 'isfile', lambda path: False)
+    @mock.patch.object(os, 'stat', autospec=True,
+                       side_effect=FileNotFoundError)
     @mock.patch('ironic.common.utils.file_has_content', autospec=True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
     def test_prepare_ramdisk_ipxe_with_copy_no_file(
-            self, render_mock, write_mock, file_has_content_mock):
+            self, render_mock, write_mock, file_has_content_mock, stat_mock):
         self.node.provision_state = states.DEPLOYING
         self.node.save()
         render_mock.return_value = 'foo'
@@ -469,7 +470,7 @@ class iPXEBootTestCase(db_base.DbTestCase):
             CONF.pxe.ipxe_boot_script,
             {'ipxe_for_mac_uri': 'pxelinux.cfg/'})
 
-    @mock.patch.object(os.path, 'isfile', lambda path: True)
+    @mock.patch.object(os, 'stat', lambda path: mock.Mock(st_size=3))
     @mock.patch.object(common_utils, 'file_has_content', lambda *args: True)
     @mock.patch('ironic.common.utils.write_to_file', autospec=True)
     @mock.patch('ironic.common.utils.render_template', autospec=True)
@@ -477,6 +478,7 @@ class iPXEBootTestCase(db_base.DbTestCase):
             self, render_mock, write_mock):
         self.node.provision_state = states.DEPLOYING
         self.node.save()
+        render_mock.return_value = 'foo'
         self._test_prepare_ramdisk()
         self.assertFalse(write_mock.called)
 